@@ -12,7 +12,7 @@ import plotly.express as px
 
 import pandas as pd
 
-from pyramid import prepare_df
+from pyramid import audit_logbook_csv, prepare_df
 
 external_stylesheets = ['https://codepen.io/chriddyp/pen/bWLwgP.css']
 
@@ -125,17 +125,18 @@ def parse_contents(contents, filename, unique, route_gear_style, ascent_gear_sty
     """ Function that preprocesses the dataframe according to the various other options.  """
     _, content_string = contents.split(',')
 
-    decoded = base64.b64decode(content_string)
     try:
         # Assume that the user uploaded a CSV file
-        df = pd.read_csv(
-            io.StringIO(decoded.decode('utf-8')))
+        decoded = base64.b64decode(content_string).decode('utf-8')
+        df = pd.read_csv(io.StringIO(decoded))
     except Exception as e: # TODO Make this exception less general.
         print(e)
         return html.Div([
             'There was an error processing this file.'
         ])
 
+    audit = audit_logbook_csv(decoded)
+
     df = prepare_df(df, unique=unique, route_gear_style=route_gear_style,
                     ascent_gear_style=ascent_gear_style, start_date=start_date,
                     end_date=end_date, free_only=(free == 'Free only'), gym=gym)
@@ -198,9 +199,30 @@ def parse_contents(contents, filename, unique, route_gear_style, ascent_gear_sty
     return html.Div([
         html.Br(),
         html.B(f'Number of climbs: {len(df)}', style={"color": "#555555"}),
-        dcc.Graph(figure=fig, config=config)
+        dcc.Graph(figure=fig, config=config),
+        audit_panel(audit),
     ])
 
+
+def table(df):
+    """ Render a small dataframe as a plain HTML table. """
+    return html.Table(
+        [html.Tr([html.Th(column) for column in df.columns])] +
+        [html.Tr([html.Td(value) for value in row]) for row in df.itertuples(index=False)]
+    )
+
+
+def audit_panel(audit):
+    """ A collapsible panel listing logbook rows that can never appear in the pyramid. """
+    dropped = audit['dropped'][audit['dropped']['Rows'] > 0]
+    children = [
+        html.Summary(f'Rows not shown in any pyramid: {dropped["Rows"].sum()} of {audit["rows"]}'),
+        table(dropped),
+    ]
+    if len(audit['unconvertible_grades']) > 0:
+        children += [html.Br(), html.B('Unconvertible grades:'), table(audit['unconvertible_grades'])]
+    return html.Details(children, style={"color": "#555555"})
+
 @app.callback(Output('date-range', 'start_date'),
               Output('date-range', 'end_date'),
               Input('clear-dates', 'n_clicks'))
@@ -5,6 +5,8 @@ Needs to be cleaned up. Tests and assertions need to be written because its poss
 """
 
 import argparse
+import functools
+import io
 from typing import Union
 
 import pandas as pd  # type: ignore
@@ -33,6 +35,9 @@ COUNTRY_TO_CONTEXT = {
     'Kenya': 'British'
 }
 
+# Ascent types that are logged on thecrag but are not climbs at all.
+NON_CLIMBS = ['Target', 'Mark', 'Hit']
+
 GYMS = ['Inner Melbourne - Hardrock CBD - Climbing routes']
 
 CONTEXT_GRADE_TO_EWBANKS = {
@@ -254,6 +259,69 @@ def is_ewbanks(ascent_grade: str) -> bool:
         return True
 
 
+def ewbanks_grades(grades: pd.Series, countries: pd.Series) -> pd.Series:
+    """ Convert a column of grades to Ewbanks, with NaN where the grade isn't supported.
+
+    Logbooks repeat the same handful of grades over and over, so each distinct (grade, country)
+    pair is converted once and the result is mapped back onto the rows.
+    """
+    # Missing values become '' so they can be used as dict keys. Neither '' nor NaN is supported.
+    pairs = list(zip(grades.fillna(''), countries.fillna('')))
+    converted = {pair: (convert_to_ewbanks(*pair) if grade_supported(*pair) else None)
+                 for pair in set(pairs)}
+    return pd.Series([converted[pair] for pair in pairs], index=grades.index, dtype='float64')
+
+
+def audit_logbook(df: pd.DataFrame) -> dict:
+    """ Work out which rows of a logbook can never make it into a pyramid, and why.
+
+    This is independent of the options passed to prepare_df, so it only needs computing once per
+    logbook. Returns a dict with:
+        - 'rows': the number of rows in the logbook.
+        - 'dropped': a dataframe of row counts per reason ('Boulder', 'Non-climb' for each
+          ascent type in NON_CLIMBS, and 'Unconvertible grade' for each country).
+        - 'unconvertible_grades': a dataframe of each unique grade string we can't convert, along
+          with the country it was logged in and the number of rows using it.
+    """
+    rows = len(df.index)
+    dropped = []
+
+    boulder = df['Route Gear Style'] == 'Boulder'
+    dropped.append(('Boulder', '', int(boulder.sum())))
+    df = df[~boulder]
+
+    non_climb = df['Ascent Type'].isin(NON_CLIMBS)
+    for ascent_type, count in df.loc[non_climb, 'Ascent Type'].value_counts().items():
+        dropped.append(('Non-climb', ascent_type, int(count)))
+    df = df[~non_climb]
+
+    # Mirror prepare_df: the ascent grade is used if assigned, otherwise the route grade.
+    grades = df['Ascent Grade'].where(df['Ascent Grade'].notna(), df['Route Grade'])
+    unconvertible = ewbanks_grades(grades, df['Country']).isna()
+    unconvertible_grades = (pd.DataFrame({'Grade': grades[unconvertible].fillna('(none)'),
+                                          'Country': df.loc[unconvertible, 'Country'].fillna('(none)')})
+                            .groupby(['Grade', 'Country'], sort=False).size()
+                            .rename('Rows').reset_index()
+                            .sort_values('Rows', ascending=False, kind='stable')
+                            .reset_index(drop=True))
+    for country, count in unconvertible_grades.groupby('Country')['Rows'].sum().items():
+        dropped.append(('Unconvertible grade', country, int(count)))
+
+    return {
+        'rows': rows,
+        'dropped': pd.DataFrame(dropped, columns=['Reason', 'Detail', 'Rows']),
+        'unconvertible_grades': unconvertible_grades,
+    }
+
+
+@functools.lru_cache(maxsize=8)
+def audit_logbook_csv(csv: str) -> dict:
+    """ Cached audit_logbook for a logbook given as CSV text, so that repeatedly re-rendering the
+    same logbook doesn't repeat the audit. The result is shared between callers and must not be
+    modified. """
+    return audit_logbook(pd.read_csv(io.StringIO(csv)))
+
+
 def reconcile_old_ticks_with_new_ticks(df: pd.DataFrame) -> pd.DataFrame:
     """ Handle discrepancy between old ticking interface and new ticking interface on thecrag."""
 
@@ -313,9 +381,7 @@ def prepare_df(df: pd.DataFrame, unique: str = 'Unique', route_gear_style: str =
         df = df[df['Route Gear Style'] == route_gear_style]
 
     # Drop targets, marks and hits, which are all non-climbs.
-    df = df[df['Ascent Type'] != 'Target']
-    df = df[df['Ascent Type'] != 'Mark']
-    df = df[df['Ascent Type'] != 'Hit']
+    df = df[~df['Ascent Type'].isin(NON_CLIMBS)]
 
     # If the ascent gear style is unknown, then inherit the route gear style
     df.loc[df['Ascent Gear Style'].isna(), 'Ascent Gear Style'] = df.loc[df['Ascent Gear Style'].isna(), 'Route Gear Style']
@@ -371,14 +437,9 @@ def prepare_df(df: pd.DataFrame, unique: str = 'Unique', route_gear_style: str =
     # Use Ascent grade if it is assigned, otherwise back off to the route grade.
     df.loc[df['Ascent Grade'].isna(), 'Ascent Grade'] = df.loc[df['Ascent Grade'].isna()]['Route Grade']
 
-    # Handle grade conversion
-    df['Ewbanks Grade'] = df[['Ascent Grade', 'Country']].apply(lambda x:
-                                                                convert_to_ewbanks(x['Ascent Grade'],
-                                                                                   x['Country']) if
-                                                                grade_supported(x['Ascent Grade'],
-                                                                                x['Country']) else None, axis=1)
-    print('NA grades:')
-    print(df[df['Ewbanks Grade'].isna()][['Route Name', 'Ascent Grade']])
+    # Handle grade conversion. Climbs with grades we can't convert are dropped here; see
+    # audit_logbook for a record of what goes missing.
+    df['Ewbanks Grade'] = ewbanks_grades(df['Ascent Grade'], df['Country'])
     df = df.dropna(subset=['Ewbanks Grade'])
 
     # This is used to determine the bar tile width in the bar chart. Every ascent tile should be